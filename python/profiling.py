@@ -0,0 +1,206 @@
+# python/profiling.py
+
+import cProfile
+import logging
+import random
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    # 0.0 이면 샘플링을 하지 않습니다. (0.01 = 요청의 1%)
+    'SAMPLE_RATE': 0.0,
+    # 관리자(is_staff) 요청에 이 헤더가 있으면 샘플링과 무관하게 프로파일링합니다.
+    # None 이면 헤더를 통한 프로파일링을 사용하지 않습니다.
+    'DEBUG_HEADER': None,
+    # None 이면 BASE_DIR / 'profiles' 를 사용합니다.
+    'DIRECTORY': None,
+    # 디렉터리에 보관할 최대 파일 수 (오래된 파일부터 삭제)
+    'MAX_FILES': 50,
+}
+
+PROFILE_EXTENSION = '.prof'
+
+# collapse_stats 가 펼치는 호출 경로의 한도
+COLLAPSE_MAX_DEPTH = 64
+# 전체 시간 대비 이 비율보다 작은 호출 경로는 부모 경로의 시간으로 합칩니다.
+COLLAPSE_MIN_FRACTION = 0.001
+
+_SLUG_RE = re.compile(r'[^A-Za-z0-9]+')
+# 파일명에 들어가는 라우트 부분의 최대 길이
+_ROUTE_MAX_LENGTH = 80
+
+
+def get_profiling_settings():
+  return {**DEFAULTS, **getattr(settings, 'PROFILING', {})}
+
+
+def get_profile_dir():
+  directory = get_profiling_settings()['DIRECTORY']
+  return Path(directory or Path(settings.BASE_DIR) / 'profiles')
+
+
+def list_profiles(directory=None):
+  # 최신 파일이 먼저 오도록 정렬합니다.
+  directory = directory or get_profile_dir()
+  if not directory.is_dir():
+    return []
+  files = [path for path in directory.iterdir()
+           if path.is_file() and path.suffix == PROFILE_EXTENSION]
+  return sorted(files, key=lambda path: path.name, reverse=True)
+
+
+def collapse_stats(stats):
+  """pstats 결과를 flamegraph.pl / speedscope 가 읽는 collapsed stack 으로 변환합니다.
+
+  cProfile 은 호출자-피호출자 관계만 기록하므로, 각 호출 경로의 시간은
+  피호출자의 누적 시간을 호출자별 비율로 나누어 근사합니다. 경로마다
+  부모의 시간을 자식에게 나누어 주므로 가중치의 합은 전체 측정 시간과 같고,
+  깊이와 최소 비율 제한을 넘는 경로는 부모 경로의 시간으로 합칩니다.
+  """
+  callees = {}
+  for func, (_, _, _, _, callers) in stats.stats.items():
+    for caller, caller_stats in callers.items():
+      callees.setdefault(caller, []).append((func, caller_stats[3]))
+
+  # 호출자 기록 없이 호출된 적이 있는 함수(프로파일 시작 지점)가 루트입니다.
+  # 미들웨어 체인처럼 재귀 호출되는 함수는 callers 가 비어있지 않으므로
+  # 전체 호출 수(stats 의 nc, callers 의 0번째 값)를 비교합니다.
+  # 루트에는 호출자 없이 호출된 비율만큼의 누적 시간만 배정하여, 프로파일 내부에서도
+  # 호출된 함수의 시간이 두 번 집계되지 않도록 합니다. 재귀 함수의 cumtime 은
+  # 가장 바깥 호출(cc)만 집계하므로 cc 를 기준으로 비율을 계산합니다.
+  roots = {}
+  for func, (cc, nc, _, cumtime, callers) in stats.stats.items():
+    top_level = nc - sum(caller_stats[0] for caller_stats in callers.values())
+    if top_level > 0:
+      roots[func] = cumtime * min(1.0, top_level / max(cc, 1))
+  min_weight = stats.total_tt * COLLAPSE_MIN_FRACTION
+  lines = {}
+
+  def label(func):
+    filename, lineno, name = func
+    if filename == '~':
+      return name.replace(';', ',')
+    return f'{name} ({Path(filename).name}:{lineno})'.replace(';', ',')
+
+  def walk(func, path, weight, depth):
+    _, _, tottime, cumtime, _ = stats.stats[func]
+    stack = f'{path};{label(func)}' if path else label(func)
+    children = callees.get(func, []) if depth < COLLAPSE_MAX_DEPTH else []
+    child_total = sum(child_cumtime for _, child_cumtime in children)
+
+    own = weight if cumtime <= 0 else min(weight, tottime * weight / cumtime)
+    if child_total <= 0:
+      own = weight
+    remaining = weight - own
+    for callee, callee_cumtime in children:
+      child_weight = remaining * callee_cumtime / child_total
+      if child_weight < min_weight:
+        own += child_weight
+      else:
+        walk(callee, stack, child_weight, depth + 1)
+
+    if own > 0:
+      lines[stack] = lines.get(stack, 0) + own
+
+  for root, weight in roots.items():
+    walk(root, '', weight, 1)
+
+  return ''.join(f'{stack} {round(weight * 1_000_000)}\n'
+                 for stack, weight in lines.items()
+                 if round(weight * 1_000_000))
+
+
+class ProfilingMiddleware:
+  """설정된 비율의 요청 또는 디버그 헤더가 있는 관리자 요청을 cProfile 로 측정합니다.
+
+  샘플링과 디버그 헤더가 모두 꺼져 있으면(기본값) MiddlewareNotUsed 를 발생시켜
+  미들웨어 체인에서 제외되므로 요청 처리에 추가 비용이 없습니다.
+  요청 중에는 pstats 파일만 저장하고, collapsed stack 변환은 다운로드 시 수행합니다.
+  """
+
+  def __init__(self, get_response):
+    config = get_profiling_settings()
+    self.sample_rate = float(config['SAMPLE_RATE'])
+    self.debug_header = config['DEBUG_HEADER']
+    if self.sample_rate <= 0 and not self.debug_header:
+      raise MiddlewareNotUsed
+
+    self.get_response = get_response
+    self.directory = get_profile_dir()
+    self.max_files = int(config['MAX_FILES'])
+
+  def __call__(self, request):
+    if not self.should_profile(request):
+      return self.get_response(request)
+
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    try:
+      profiler.enable()
+    except ValueError:
+      # Python 3.12+ 에서는 프로파일러가 프로세스 단위(sys.monitoring)로 동작하므로
+      # 다른 요청이 이미 프로파일링 중이면 이 요청은 측정 없이 처리합니다.
+      logger.debug('다른 프로파일러가 동작 중이어서 프로파일링을 건너뜁니다.')
+      return self.get_response(request)
+    try:
+      response = self.get_response(request)
+    finally:
+      profiler.disable()
+    duration_ms = (time.perf_counter() - started) * 1000
+
+    # 프로파일 저장에 실패해도 요청 자체는 정상 응답해야 합니다.
+    try:
+      self.save(profiler, request, duration_ms)
+    except OSError:
+      logger.exception('프로파일을 저장하지 못했습니다: %s', self.directory)
+    return response
+
+  def should_profile(self, request):
+    if self.sample_rate > 0 and random.random() < self.sample_rate:
+      return True
+    if self.debug_header and request.headers.get(self.debug_header):
+      return self.is_staff(request)
+    return False
+
+  def is_staff(self, request):
+    # 세션 로그인 사용자를 먼저 확인하고, 없으면 JWT 토큰으로 확인합니다.
+    # DRF 인증은 뷰에서 수행되므로, 디버그 헤더가 있는 요청은 여기서 토큰 검증과
+    # 사용자 조회 쿼리가 한 번 더 실행됩니다.
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+      return user.is_staff
+    try:
+      result = JWTAuthentication().authenticate(request)
+    except APIException:
+      return False
+    return result is not None and result[0].is_staff
+
+  def save(self, profiler, request, duration_ms):
+    match = request.resolver_match
+    # 라우트를 찾지 못한 요청은 클라이언트가 보낸 경로 대신 고정된 이름을 사용합니다.
+    route = match.route if match is not None else 'unresolved'
+    # 파일명 형식: 20250101-120000_123456_POST_login_12ms.prof
+    filename = '{}_{}_{}_{}ms{}'.format(
+        datetime.now().strftime('%Y%m%d-%H%M%S_%f'),
+        request.method,
+        _SLUG_RE.sub('-', route).strip('-')[:_ROUTE_MAX_LENGTH] or 'root',
+        int(duration_ms),
+        PROFILE_EXTENSION,
+    )
+
+    self.directory.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(self.directory / filename)
+    self.rotate()
+
+  def rotate(self):
+    for path in list_profiles(self.directory)[self.max_files:]:
+      path.unlink(missing_ok=True)
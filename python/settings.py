@@ -41,6 +41,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'python.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -142,3 +143,13 @@ SPECTACULAR_SETTINGS = {
 }
 
 STATIC_ROOT = BASE_DIR / "static"
+
+# 요청 프로파일링(ProfilingMiddleware) 설정
+# SAMPLE_RATE 가 0 이고 DEBUG_HEADER 가 None 이면 미들웨어가 비활성화됩니다.
+PROFILING = {
+    'SAMPLE_RATE': 0.0,
+    # 'X-Profile' 등으로 지정하면 해당 헤더가 있는 관리자 요청을 프로파일링합니다.
+    'DEBUG_HEADER': None,
+    'DIRECTORY': BASE_DIR / 'profiles',
+    'MAX_FILES': 50,
+}
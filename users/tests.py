@@ -1,8 +1,14 @@
 # users/tests.py
 
+import cProfile
+import io
+import pstats
+
 import pytest
+from django.core.exceptions import MiddlewareNotUsed
 from django.urls import reverse
 from rest_framework import status
+from python.profiling import ProfilingMiddleware, collapse_stats
 from .models import User
 import json
 
@@ -143,4 +149,244 @@ class TestAdminRoleGrant:
 
     # then: 403 Forbidden 에러가 발생하는지 확인
     assert response.status_code == status.HTTP_403_FORBIDDEN
-    assert response.json()['error']['code'] == 'ACCESS_DENIED'
\ No newline at end of file
+    assert response.json()['error']['code'] == 'ACCESS_DENIED'
+
+def _leaf():
+  return sum(range(20000))
+
+
+def _recurse(depth):
+  # collapse_stats 테스트용 재귀 함수
+  _leaf()
+  if depth:
+    _recurse(depth - 1)
+
+
+def _entry():
+  _recurse(5)
+  _leaf()
+
+
+class TestCollapseStats:
+  def test_recursive_call_graph(self):
+    # given: 재귀 함수가 포함된 호출 그래프를 프로파일링
+    profiler = cProfile.Profile()
+    profiler.enable()
+    # _leaf 는 최상위와 _entry 내부에서 모두 호출됨
+    _leaf()
+    _entry()
+    profiler.disable()
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+
+    # when
+    collapsed = collapse_stats(stats)
+
+    # then: 진입 함수가 루트이고, 재귀 함수는 별도 루트로 중복되지 않음
+    stacks = {}
+    for line in collapsed.splitlines():
+      stack, weight = line.rsplit(' ', 1)
+      stacks[stack] = int(weight)
+    roots = {stack.split(';')[0] for stack in stacks}
+    assert not any(root.startswith('_recurse ') for root in roots)
+    assert any(stack.startswith('_entry (tests.py') and
+               stack.endswith(';_leaf (tests.py:{})'.format(
+                   _leaf.__code__.co_firstlineno))
+               for stack in stacks)
+    assert any(';_recurse (tests.py' in stack and
+               stack.endswith('<built-in method builtins.sum>')
+               for stack in stacks)
+
+    # then: 가중치의 합이 측정된 전체 시간과 같음 (중복 집계 없음)
+    assert sum(stacks.values()) == pytest.approx(stats.total_tt * 1_000_000,
+                                                 rel=0.01)
+
+
+@pytest.mark.django_db
+class TestProfiling:
+  @pytest.fixture
+  def profile_dir(self, settings, tmp_path):
+    # 프로파일 파일이 임시 디렉터리에 저장되도록 설정
+    settings.PROFILING = {'SAMPLE_RATE': 0.0, 'DEBUG_HEADER': 'X-Profile',
+                          'DIRECTORY': tmp_path, 'MAX_FILES': 2}
+    return tmp_path
+
+  @pytest.fixture
+  def admin_user(self):
+    return User.objects.create_superuser(username='admin', password='password',
+                                         nickname='admin_nick')
+
+  @pytest.fixture
+  def normal_user(self):
+    return User.objects.create_user(username='user', password='password',
+                                    nickname='user_nick')
+
+  def get_token(self, client, username, password):
+    url = reverse('login')
+    data = {'username': username, 'password': password}
+    response = client.post(url, data=json.dumps(data),
+                           content_type='application/json')
+    return response.json()['token']
+
+  def test_middleware_unused_by_default(self, settings):
+    # given: 기본 설정 (샘플링과 디버그 헤더 모두 꺼짐)
+    settings.PROFILING = {}
+
+    # when / then: 미들웨어 체인에서 제외됨
+    with pytest.raises(MiddlewareNotUsed):
+      ProfilingMiddleware(lambda request: None)
+
+  def test_profile_saved_for_staff_with_debug_header(self, client, profile_dir,
+                                                     admin_user):
+    # given: 관리자 토큰
+    admin_token = self.get_token(client, 'admin', 'password')
+
+    # when: 디버그 헤더와 함께 요청
+    response = client.get(reverse('profile'),
+                          HTTP_AUTHORIZATION=f'Bearer {admin_token}',
+                          HTTP_X_PROFILE='1')
+
+    # then: 라우트가 포함된 프로파일 파일이 저장되었는지 확인
+    assert response.status_code == status.HTTP_200_OK
+    files = list(profile_dir.iterdir())
+    assert len(files) == 1
+    assert '_GET_profile_' in files[0].name
+    assert files[0].suffix == '.prof'
+
+  def test_debug_header_ignored_for_normal_user(self, client, profile_dir,
+                                                normal_user):
+    # given: 일반 사용자 토큰
+    token = self.get_token(client, 'user', 'password')
+
+    # when: 디버그 헤더와 함께 요청
+    client.get(reverse('profile'), HTTP_AUTHORIZATION=f'Bearer {token}',
+               HTTP_X_PROFILE='1')
+
+    # then: 프로파일이 저장되지 않음
+    assert list(profile_dir.iterdir()) == []
+
+  def test_sampled_profiles_are_rotated(self, client, settings, profile_dir,
+                                        normal_user):
+    # given: 모든 요청을 샘플링
+    settings.PROFILING = {**settings.PROFILING, 'SAMPLE_RATE': 1.0}
+
+    # when: MAX_FILES 보다 많은 요청
+    for _ in range(3):
+      self.get_token(client, 'user', 'password')
+
+    # then: 최근 MAX_FILES 개의 파일만 남음
+    files = list(profile_dir.iterdir())
+    assert len(files) == 2
+    assert all('_POST_login_' in path.name for path in files)
+
+  def test_unresolved_long_path_uses_fixed_tag(self, client, settings,
+                                               profile_dir):
+    # given: 모든 요청을 샘플링
+    settings.PROFILING = {**settings.PROFILING, 'SAMPLE_RATE': 1.0}
+
+    # when: 존재하지 않는 긴 경로로 요청
+    response = client.get('/nonexistent/' + 'a' * 300)
+
+    # then: 클라이언트 경로 대신 고정된 이름으로 저장됨
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    files = list(profile_dir.iterdir())
+    assert len(files) == 1
+    assert '_GET_unresolved_' in files[0].name
+
+  def test_request_served_while_another_profiler_active(self, client, settings,
+                                                        profile_dir,
+                                                        normal_user):
+    # given: 모든 요청을 샘플링하고, 다른 프로파일러가 이미 동작 중
+    settings.PROFILING = {**settings.PROFILING, 'SAMPLE_RATE': 1.0}
+    profiler = cProfile.Profile()
+    profiler.enable()
+
+    # when
+    try:
+      response = client.post(reverse('login'),
+                             data=json.dumps({'username': 'user',
+                                              'password': 'password'}),
+                             content_type='application/json')
+    finally:
+      profiler.disable()
+
+    # then: 프로파일링 여부와 관계없이 요청은 정상 응답
+    assert response.status_code == status.HTTP_200_OK
+
+  def test_save_failure_does_not_break_request(self, client, settings,
+                                               tmp_path, normal_user):
+    # given: 디렉터리 자리에 파일이 있어 저장할 수 없는 경로
+    blocked = tmp_path / 'blocked'
+    blocked.write_text('')
+    settings.PROFILING = {'SAMPLE_RATE': 1.0, 'DIRECTORY': blocked}
+
+    # when
+    response = client.post(reverse('login'),
+                           data=json.dumps({'username': 'user',
+                                            'password': 'password'}),
+                           content_type='application/json')
+
+    # then: 요청은 정상 응답
+    assert response.status_code == status.HTTP_200_OK
+
+  def test_admin_can_list_and_download_profiles(self, client, profile_dir,
+                                                admin_user):
+    # given: 디버그 헤더로 저장한 프로파일
+    admin_token = self.get_token(client, 'admin', 'password')
+    auth = {'HTTP_AUTHORIZATION': f'Bearer {admin_token}'}
+    client.get(reverse('profile'), HTTP_X_PROFILE='1', **auth)
+
+    # when: 목록 조회 후 다운로드
+    response = client.get(reverse('admin-profile-list'), **auth)
+    name = response.json()[0]['name']
+    download = client.get(
+        reverse('admin-profile-download', kwargs={'name': name}), **auth)
+
+    # then
+    assert response.status_code == status.HTTP_200_OK
+    assert download.status_code == status.HTTP_200_OK
+    assert b''.join(download.streaming_content) == \
+           (profile_dir / name).read_bytes()
+
+  def test_download_as_collapsed_stacks(self, client, profile_dir,
+                                        admin_user):
+    # given: 디버그 헤더로 저장한 프로파일
+    admin_token = self.get_token(client, 'admin', 'password')
+    auth = {'HTTP_AUTHORIZATION': f'Bearer {admin_token}'}
+    client.get(reverse('profile'), HTTP_X_PROFILE='1', **auth)
+    name = next(profile_dir.iterdir()).name
+
+    # when: collapsed stack 형식으로 다운로드
+    response = client.get(
+        reverse('admin-profile-download', kwargs={'name': name}),
+        {'output': 'collapsed'}, **auth)
+
+    # then: 모든 줄이 "스택 가중치" 형식
+    assert response.status_code == status.HTTP_200_OK
+    lines = response.content.decode().splitlines()
+    assert lines
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+    assert any('get (views.py' in line for line in lines)
+
+  def test_download_unknown_profile(self, client, profile_dir, admin_user):
+    # given
+    admin_token = self.get_token(client, 'admin', 'password')
+
+    # when: 존재하지 않는 파일 이름으로 요청
+    response = client.get(
+        reverse('admin-profile-download', kwargs={'name': '..settings.py'}),
+        HTTP_AUTHORIZATION=f'Bearer {admin_token}')
+
+    # then
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+  def test_profile_list_requires_admin(self, client, profile_dir, normal_user):
+    # given
+    token = self.get_token(client, 'user', 'password')
+
+    # when
+    response = client.get(reverse('admin-profile-list'),
+                          HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    # then
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert response.json()['error']['code'] == 'ACCESS_DENIED'
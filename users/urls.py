@@ -1,5 +1,6 @@
 from django.urls import path
-from .views import SignupView, LoginView, ProfileView, AdminRoleGrantView
+from .views import SignupView, LoginView, ProfileView, AdminRoleGrantView, \
+  AdminProfileListView, AdminProfileDownloadView
 
 urlpatterns = [
   path('signup', SignupView.as_view(), name='signup'),
@@ -7,4 +8,8 @@ urlpatterns = [
   path('profile', ProfileView.as_view(), name='profile'),
   path('api/admin/users/<int:user_id>/roles', AdminRoleGrantView.as_view(),
        name='admin-role-grant'),
+  path('api/admin/profiles', AdminProfileListView.as_view(),
+       name='admin-profile-list'),
+  path('api/admin/profiles/<str:name>', AdminProfileDownloadView.as_view(),
+       name='admin-profile-download'),
 ]
\ No newline at end of file
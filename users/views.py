@@ -1,15 +1,21 @@
+import pstats
+from datetime import datetime, timezone
+
 from django.db import IntegrityError
+from django.http import FileResponse, HttpResponse
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from python.profiling import list_profiles, collapse_stats
 from .models import User
 from .serializers import UserSignupSerializer, UserLoginSerializer, \
   UserProfileSerializer
 
-from drf_spectacular.utils import extend_schema, OpenApiExample
+from drf_spectacular.utils import extend_schema, OpenApiExample, \
+  OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
 
@@ -178,4 +184,78 @@ class AdminRoleGrantView(APIView):
     target_user.save()
 
     serializer = UserProfileSerializer(target_user)
-    return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+    return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class AdminProfileListView(APIView):
+  permission_classes = [IsAdminUser]
+
+  @extend_schema(
+      tags=["Admin API"],
+      summary="프로파일 목록 조회",
+      description="ProfilingMiddleware 가 저장한 최근 프로파일 파일 목록을 최신순으로 조회합니다. **(관리자 JWT 인증 필요)**",
+      responses={200: OpenApiTypes.OBJECT, 403: OpenApiTypes.OBJECT},
+      examples=[
+        OpenApiExample(
+            '성공 예시',
+            summary='프로파일 목록 조회 성공',
+            value=[{'name': '20250101-120000_123456_POST_login_12ms.prof',
+                    'size': 20480,
+                    'created_at': '2025-01-01T12:00:00+00:00'}],
+            response_only=True, status_codes=[200]
+        )
+      ]
+  )
+  def get(self, request):
+    profiles = []
+    for path in list_profiles():
+      stat = path.stat()
+      profiles.append({
+        "name": path.name,
+        "size": stat.st_size,
+        "created_at": datetime.fromtimestamp(stat.st_mtime,
+                                             tz=timezone.utc).isoformat(),
+      })
+    return Response(profiles, status=status.HTTP_200_OK)
+
+
+class AdminProfileDownloadView(APIView):
+  permission_classes = [IsAdminUser]
+
+  @extend_schema(
+      tags=["Admin API"],
+      summary="프로파일 다운로드",
+      description="저장된 pstats 프로파일(.prof)을 다운로드합니다. `output=collapsed` 를 지정하면 flamegraph 용 collapsed stack 으로 변환하여 반환합니다. **(관리자 JWT 인증 필요)**",
+      parameters=[
+        OpenApiParameter('output', OpenApiTypes.STR, enum=['collapsed'],
+                         description='collapsed 로 지정하면 collapsed stack 텍스트를 반환합니다.')
+      ],
+      responses={200: OpenApiTypes.BINARY, 403: OpenApiTypes.OBJECT,
+                 404: OpenApiTypes.OBJECT},
+      examples=[
+        OpenApiExample(
+            '실패 예시 (파일 없음)',
+            summary='프로파일 없음',
+            value={'message': '해당 이름의 프로파일을 찾을 수 없습니다.'},
+            response_only=True, status_codes=[404]
+        )
+      ]
+  )
+  def get(self, request, name):
+    # 목록에 있는 파일만 허용하여 디렉터리 밖의 경로 접근을 막습니다.
+    profiles = {path.name: path for path in list_profiles()}
+    if name not in profiles:
+      return Response({"message": "해당 이름의 프로파일을 찾을 수 없습니다."},
+                      status=status.HTTP_404_NOT_FOUND)
+
+    # collapsed stack 변환은 요청 처리 중이 아닌 다운로드 시점에 수행합니다.
+    if request.query_params.get('output') == 'collapsed':
+      stats = pstats.Stats(str(profiles[name]))
+      response = HttpResponse(collapse_stats(stats),
+                              content_type='text/plain; charset=utf-8')
+      response['Content-Disposition'] = \
+        f'attachment; filename="{profiles[name].stem}.collapsed"'
+      return response
+
+    return FileResponse(profiles[name].open('rb'), as_attachment=True,
+                        filename=name)